@@ -1,27 +1,30 @@
-from . import uvstrap
-from . import uvconfig
-from . import uvstub
-
+import importlib
 import sys
 
+# opt: (module, entry, prog name); modules are only imported when selected
+commands = {
+    "strap": ("uvstrap", "strap", "python -m uvhelper strap"),
+    # this will be replaced with a proper cli later
+    "test_config": ("uvconfig", "test_config", "python -m uvhelper config"),
+    "stub": ("uvstub", "stub", "python -m uvhelper stub"),
+}
+
+
+def run(opt: str) -> None:
+    modname, fn, prog = commands.get(opt, (None, None, None))
+    if modname is None:
+        raise NotImplementedError(f"opt not available")
+    sys.argv[0] = prog
+    mod = importlib.import_module(f".{modname}", __package__)
+    getattr(mod, fn)()
+
+
 if __name__ == "__main__":
     if len(sys.argv) == 0:
         exit(-1)
     elif len(sys.argv) == 1:
-        uvstrap.strap()
+        importlib.import_module(".uvstrap", __package__).strap()
     else:
         opt = sys.argv[1]
         del sys.argv[1]
-        match opt:
-            case "strap":
-                sys.argv[0] = "python -m uvhelper strap"
-                uvstrap.strap()
-            case "test_config":
-                sys.argv[0] = "python -m uvhelper config"
-                # this will be replaced with a proper cli later
-                uvconfig.test_config()
-            case "stub":
-                sys.argv[0] = "python -m uvhelper stub"
-                uvstub.stub()
-            case _:
-                raise NotImplementedError(f"opt not available")
+        run(opt)
@@ -1,10 +1,12 @@
 import lzma, base64
+import functools
 
 
 def compress(data: bytes) -> bytes:
     return base64.b64encode(lzma.compress(data))
 
 
+@functools.lru_cache(maxsize=32)
 def decompress(data: bytes) -> bytes:
     return lzma.decompress(base64.b64decode(data))
 
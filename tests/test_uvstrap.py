@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from .. import uvstrap
+
+
+class CopyFileCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "src.h")
+        self.dst = os.path.join(self.tmp.name, "dst.h")
+        with open(self.src, "w", encoding="utf-8") as f:
+            f.write("#define NEW\n")
+        # stale destination, so the failed copy leaves an existing dst behind
+        with open(self.dst, "w", encoding="utf-8") as f:
+            f.write("#define OLD\n")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def read_dst(self) -> str:
+        with open(self.dst, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_failed_copy_is_not_cached(self):
+        cache: dict[str, list[list[int]]] = {}
+        with mock.patch.object(
+            uvstrap.shutil, "copyfile", side_effect=OSError("disk full")
+        ):
+            uvstrap.copy_file(self.src, self.dst, cache)
+        self.assertNotIn(self.dst, cache)
+        self.assertEqual(self.read_dst(), "#define OLD\n")
+
+        uvstrap.copy_file(self.src, self.dst, cache)
+        self.assertEqual(self.read_dst(), "#define NEW\n")
+        self.assertIn(self.dst, cache)
+
+    def test_failed_copy_drops_stale_entry(self):
+        cache = {self.dst: [[0, 0], [0, 0]]}
+        with mock.patch.object(
+            uvstrap.shutil, "copyfile", side_effect=OSError("disk full")
+        ):
+            uvstrap.copy_file(self.src, self.dst, cache)
+        self.assertNotIn(self.dst, cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
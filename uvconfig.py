@@ -1,147 +1,313 @@
 # from . import uvstrap
+from __future__ import annotations
 
-import xml.etree.ElementTree as ET
-from typing import Self, MutableSequence, Literal
-import copy
+from typing import ClassVar, Iterable
 from warnings import warn
 import glob
-from collections import OrderedDict
 import os
-
-
-class UVConfigBase(ET.Element):
-    default_opts: dict[str, str]
-    valid_keys: dict[str, None]
-    option_keys: dict[str, None]
-    options: OrderedDict[str, str]
+import sys
+
+# lxml is optional, the stdlib tree is the fallback
+try:
+    from lxml import etree as ET
+
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+    HAS_LXML = False
+
+    # configs wrap plain elements, so tree walks run in the C accelerator if present
+    try:
+        import _elementtree
+
+        if ET.Element is not _elementtree.Element:
+            warn("xml.etree.ElementTree is not using the C accelerator")
+    except ImportError:
+        warn("_elementtree unavailable, falling back to pure-python ElementTree")
+
+
+# intern keys and str values so repeated tags and defaults share one object
+def _intern_dict(d: dict[str, str] | dict[str, None]) -> dict:
+    return {sys.intern(k): v if v is None else sys.intern(v) for k, v in d.items()}
+
+
+class UVConfigBase:
+    __slots__ = ("_elem", "options", "option_elems", "subconfigs")
+    _elem: ET.Element
+    # keys only depend on the config class, shared by all instances
+    default_opts: ClassVar[dict[str, str]] = {}
+    # only tested for membership; class bodies list the non-option keys,
+    # option keys are added per class. option_keys keeps its order for loading
+    valid_keys: ClassVar[frozenset[str]] = frozenset()
+    option_keys: ClassVar[dict[str, None]] = {}
+    # attr: (tag, config class), each built on first access; subconfigs
+    # (and thus repr, flatten and sync) builds them all
+    lazy_subconfigs: ClassVar[dict[str, tuple[str, type]]] = {}
+    options: dict[str, str]
+    # option key: its element, recorded on load so syncing needs no lookups
+    option_elems: dict[str, ET.Element]
     subconfigs: list["UVConfigBase"]
 
     def __init__(self, elem: ET.Element | str = "") -> None:
-        if isinstance(elem, ET.Element):
-            # copy
-            super().__init__(elem.tag, elem.attrib)
-            for sube in elem:
-                self.append(sube)
-        else:
-            assert isinstance(elem, str)
+        if ET.iselement(elem):
+            # alias, the config works on the parsed element in place
+            self._elem = elem
+        elif isinstance(elem, str):
             warn(f"creating empty config <{elem}/>")
-            super().__init__(elem)
-        self.default_opts = dict()
-        self.valid_keys = dict()
-        self.option_keys = dict()
-        self.options = OrderedDict()
-        self.subconfigs = []
+            self._elem = ET.Element(sys.intern(elem))
+        else:
+            raise TypeError(f"expected element or tag, got {type(elem).__name__}")
+        self.options, self.option_elems = {}, {}
+        if not self.lazy_subconfigs:
+            self.subconfigs = []
+
+    # reached for unset slots, i.e. lazy subconfigs not built yet, but also
+    # when a property raises AttributeError
+    def __getattr__(self, name: str):
+        lazy = type(self).lazy_subconfigs
+        if not lazy or (name != "subconfigs" and name not in lazy):
+            # not ours, let the lookup raise its own error again
+            return object.__getattribute__(self, name)
+        try:
+            if name == "subconfigs":
+                self.load_lazy_subconfigs()
+                return object.__getattribute__(self, name)
+            return self.load_lazy_subconfig(name)
+        except AttributeError as e:
+            # escaping as AttributeError would read as a missing attribute
+            raise RuntimeError(
+                f"loading {name!r} of {type(self).__name__!r} failed"
+            ) from e
+
+    # build a single lazy subconfig; it is linked once subconfigs is built
+    def load_lazy_subconfig(self, name: str) -> UVConfigBase:
+        tag, config_cls = self.lazy_subconfigs[name]
+        sub = config_cls(self._child(tag))
+        setattr(self, name, sub)
+        return sub
+
+    def load_lazy_subconfigs(self):
+        subconfigs = []
+        for name in self.lazy_subconfigs:
+            try:
+                sub = object.__getattribute__(self, name)
+            except AttributeError:
+                sub = self.load_lazy_subconfig(name)
+            subconfigs.append(sub)
+        self.subconfigs = subconfigs
+        # the project was linked before these existed
+        self.link()
+
+    def lazy_pending(self) -> bool:
+        try:
+            object.__getattribute__(self, "subconfigs")
+        except AttributeError:
+            return True
+        return False
+
+    @property
+    def tag(self) -> str:
+        return self._elem.tag
 
     # make xml fits to key requirements
-    def load_keys(self: Self):
-        # update keys and validate
-        self.option_keys.update(dict.fromkeys(self.default_opts))
-        self.valid_keys.update(self.option_keys)
-        for key in self.valid_keys:
-            assert key.isidentifier(), f"invalid key {key} in {self.tag}"
-        # remove invalid keys and collect existing keys
-        subs: set[str] = set()
-        for elem in self:
-            if not elem.tag in self.valid_keys:
-                warn(f"{elem.tag} is not a valid tag in {self.tag}")
-                self.remove(elem)
-            else:
-                subs.add(elem.tag)
-        # create keys that are options but do not exist
-        for tag in set(self.default_opts) - subs:
-            sube = ET.Element(tag)
-            sube.text = self.default_opts[tag]
+    def load_keys(self) -> dict[str, ET.Element]:
+        # remove invalid keys and collect (the first of) existing keys
+        # (removal is deferred as it would skip elements while iterating)
+        children: dict[str, ET.Element] = {}
+        invalid: list[ET.Element] = []
+        valid_keys = self.valid_keys
+        for elem in self._elem:
+            if not elem.tag in valid_keys:
+                invalid.append(elem)
+            elif not elem.tag in children:
+                children[elem.tag] = elem
+        for elem in invalid:
+            self._elem.remove(elem)
+        if invalid:
             warn(
-                f"adding default elem <{tag}>{self.default_opts[tag]}<{tag}/> in {self.tag}"
+                f"removed {len(invalid)} invalid tags in {self.tag}: "
+                f"{[e.tag for e in invalid]}"
             )
-            self.append(sube)
-
-    # load self.options from xml
-    def load_options(self: Self):
+        # create keys that are options but do not exist
+        missing = [tag for tag in self.default_opts if not tag in children]
+        new_elems = [ET.Element(tag) for tag in missing]
+        for tag, elem in zip(missing, new_elems):
+            elem.text = self.default_opts[tag]
+            children[tag] = elem
+        self._elem.extend(new_elems)
+        if missing:
+            warn(f"added {len(missing)} default elems in {self.tag}: {missing}")
+        return children
+
+    # first direct child with tag, without going through ElementPath
+    def _child(self, tag: str) -> ET.Element | None:
+        return next((c for c in self._elem if c.tag == tag), None)
+
+    # all direct children with tag, in document order
+    def _children_with(self, tag: str) -> list[ET.Element]:
+        return [c for c in self._elem if c.tag == tag]
+
+    # map tags to (the first of) direct children, in one pass
+    def children(self) -> dict[str, ET.Element]:
+        ret: dict[str, ET.Element] = {}
+        for elem in self._elem:
+            ret.setdefault(elem.tag, elem)
+        return ret
+
+    # load self.options from xml, children as collected by load_keys
+    def load_options(self, children: dict[str, ET.Element] | None = None):
+        if children is None:
+            children = self.children()
+        options, default_opts = self.options, self.default_opts
+        option_elems = self.option_elems
         for key in self.option_keys:
-            elem: ET.Element | None = self.find(f"./{key}")
+            elem: ET.Element | None = children.get(key)
             if elem is None:
                 warn(f"expected option <{key}>...<{key}/>")
-                self.options[key] = (
-                    self.default_opts[key] if key in self.default_opts else ""
-                )
+                options[key] = default_opts.get(key, "")
             else:
-                self.options[key] = elem.text if isinstance(elem.text, str) else ""
-
-    def load(self: Self):
-        self.load_keys()
-        self.load_options()
-
-    def sync_options(self: Self, recurse: bool = True):
-        for key, val in self.options.items():
-            assert key.isidentifier()
-            elem: ET.Element | None = self.find(f"./{key}")
+                options[key] = elem.text or ""
+                option_elems[key] = elem
+
+    # a single walk over the children serves both steps
+    def load(self) -> dict[str, ET.Element]:
+        children = self.load_keys()
+        self.load_options(children)
+        return children
+
+    def flatten(self, recurse: bool = True) -> "UVNodeTable":
+        return UVNodeTable(self, recurse)
+
+    def sync_options(self, recurse: bool = True):
+        table = self.flatten(recurse)
+        nodes = table.nodes
+        for idx, key, elem in table.option_rows:
+            node = nodes[idx]
+            val = node.options[key]
             if elem is None:
+                # only keys without an element can be new, check before creating
+                assert key.isidentifier(), f"invalid key {key} in {node.tag}"
                 warn(f"adding missing option <{key}>...<{key}/>")
-                elem = UVConfigBase(key)
-                self.append(elem)
+                elem = node.option_elems[key] = ET.SubElement(node._elem, key)
             elem.text = "" if val is None else val
-        if recurse:
-            for sube in self.subconfigs:
-                sube.sync_options(recurse)
-
-    def link(self: Self, recurse: bool = True):
-        # Remove existing children that match subconfig tags
-        subconfig_tags = {sub.tag: i for i, sub in enumerate(self.subconfigs)}
-        for i in range(len(self)):
-            if self[i].tag in subconfig_tags:
-                self[i] = self.subconfigs[subconfig_tags[self[i].tag]]
-        if recurse:
-            for sube in self.subconfigs:
-                if not sube in self:
-                    self.append(sube)
-                sube.link(recurse)
+
+    def link(self, recurse: bool = True):
+        stack: list[UVConfigBase] = [self]
+        while stack:
+            node = stack.pop()
+            # unbuilt subtrees still are the parsed elements, nothing to link
+            if node.lazy_subconfigs and node.lazy_pending():
+                continue
+            subs, elem = node.subconfigs, node._elem
+            if not subs:
+                continue
+            # Replace stale children that match subconfig tags, append missing ones
+            subconfig_tags = {sub.tag: sub._elem for sub in subs}
+            linked = {sub._elem for sub in subs}
+            children = list(elem)
+            stale = [
+                i
+                for i, child in enumerate(children)
+                if not child in linked and child.tag in subconfig_tags
+            ]
+            # subconfigs alias their elements, so usually nothing is stale
+            if stale:
+                for i in stale:
+                    children[i] = subconfig_tags[children[i].tag]
+                elem[:] = children
+            present = set(children)
+            for sub in subs:
+                if not sub._elem in present:
+                    elem.append(sub._elem)
+            if recurse:
+                stack.extend(reversed(node.subconfigs))
 
     def __repr__(self, indent: int = 0, has_this: bool = True) -> str:
-        rep = " " * indent + f"<{self.tag}>\n" if has_this else ""
-        # for sube in self:
-        # if isinstance(sube, UVConfigBase):
-        # assert isinstance(sube, UVConfigBase)
-        # rep += sube.__repr__(indent + 2)
-        # else:
-        # rep += " " * (indent + 2) + f"<{sube.tag}>{sube.text}</{sube.tag}>\n"
+        parts: list[str] = []
+        self.repr_into(parts, indent, has_this)
+        return "".join(parts)
+
+    # append the xml lines of this subtree to parts, joined once by the caller
+    def repr_into(self, parts: list[str], indent: int = 0, has_this: bool = True):
+        pad = " " * (indent + 2)
+        if has_this:
+            parts.append(f"{' ' * indent}<{self.tag}>\n")
         for key, val in self.options.items():
-            rep += " " * (indent + 2) + f"<{key}>{''if val is None else val}</{key}>\n"
+            parts.append(f"{pad}<{key}>{'' if val is None else val}</{key}>\n")
         for sube in self.subconfigs:
             assert isinstance(sube, UVConfigBase)
-            rep += sube.__repr__(indent + 2)
-        rep += " " * indent + f"</{self.tag}>\n" if has_this else ""
-        return rep
+            sube.repr_into(parts, indent + 2)
+        if has_this:
+            parts.append(f"{' ' * indent}</{self.tag}>\n")
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # options with defaults are options, options are valid keys
+        cls.default_opts = _intern_dict(cls.default_opts)
+        cls.option_keys = _intern_dict(
+            cls.option_keys | dict.fromkeys(cls.default_opts)
+        )
+        cls.valid_keys = frozenset(
+            map(sys.intern, cls.valid_keys | cls.option_keys.keys())
+        )
+        # validate keys once per class rather than on every load
+        for key in cls.valid_keys:
+            assert key.isidentifier(), f"invalid key {key} in {cls.__qualname__}"
+
+
+class UVNodeTable:
+    # flattened view of a config tree in document order, nodes are rows of
+    # nodes, options are rows of option_rows
+    __slots__ = ("nodes", "option_rows")
+    nodes: list[UVConfigBase]
+    # (index into nodes, option key, existing option element)
+    option_rows: list[tuple[int, str, ET.Element | None]]
+
+    def __init__(self, root: UVConfigBase, recurse: bool = True) -> None:
+        self.nodes, self.option_rows = [], []
+        stack: list[UVConfigBase] = [root]
+        while stack:
+            node = stack.pop()
+            idx = len(self.nodes)
+            self.nodes.append(node)
+            option_elems = node.option_elems
+            for key in node.options:
+                self.option_rows.append((idx, key, option_elems.get(key)))
+            if recurse:
+                stack.extend(reversed(node.subconfigs))
 
 
 class UVTargetCommonOption(UVConfigBase):
+    __slots__ = ("target_status", "before_compile", "before_make", "after_make")
+
     class TargetStatus(UVConfigBase):
+        __slots__ = ()
+        default_opts = {
+            "Error": "0",
+            "ExitCodeStop": "0",
+            "ButtonStop": "0",
+            "NotGenerated": "0",
+            "InvalidFlash": "1",
+        }
+        option_keys = dict.fromkeys(default_opts)
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "TargetStatus")
             assert self.tag == "TargetStatus", f"target status xml tag {self.tag}"
 
-            self.default_opts = {
-                "Error": "0",
-                "ExitCodeStop": "0",
-                "ButtonStop": "0",
-                "NotGenerated": "0",
-                "InvalidFlash": "1",
-            }
-            self.option_keys = dict.fromkeys(self.default_opts)
-            self.valid_keys = self.option_keys
-
             self.load()
 
     target_status: TargetStatus
 
     class CostumeCommands(UVConfigBase):
-        def __init__(
-            self, elem: ET.Element | None = None, id: str = "U", default_tag: str = ""
-        ) -> None:
-            super().__init__(elem if elem is not None else default_tag)
-            assert self.tag == default_tag, f"costume command xml tag {self.tag}"
+        __slots__ = ()
+        # stop keys are named after the command's id, e.g. nStopU1X; each
+        # command is a subclass so its key tables stay class-level
+        default_tag: ClassVar[str] = ""
 
-            self.default_opts = {
+        def __init_subclass__(cls, id: str = "", **kwargs) -> None:
+            cls.default_opts = {
                 "RunUserProg1": "0",
                 "RunUserProg2": "0",
                 "UserProg1Name": "",
@@ -151,91 +317,101 @@ class UVTargetCommonOption(UVConfigBase):
                 f"nStop{id}1X": "0",
                 f"nStop{id}2X": "0",
             }
-            self.option_keys = dict.fromkeys(self.default_opts)
-            self.valid_keys = self.option_keys
+            super().__init_subclass__(**kwargs)
+
+        def __init__(self, elem: ET.Element | None = None) -> None:
+            super().__init__(elem if elem is not None else self.default_tag)
+            assert self.tag == self.default_tag, f"costume command xml tag {self.tag}"
 
             self.load()
 
+    class BeforeCompile(CostumeCommands, id="U"):
+        __slots__ = ()
+        default_tag = "BeforeCompile"
+
+    class BeforeMake(CostumeCommands, id="B"):
+        __slots__ = ()
+        default_tag = "BeforeMake"
+
+    class AfterMake(CostumeCommands, id="A"):
+        __slots__ = ()
+        default_tag = "AfterMake"
+
     before_compile: CostumeCommands
     before_make: CostumeCommands
     after_make: CostumeCommands
 
+    default_opts = {
+        "Device": "STM32F103ZE",
+        "Vendor": "STMicroelectronics",
+        "PackID": "Keil.STM32F1xx_DFP.2.4.1",
+        "PackURL": "https://www.keil.com/pack/",
+        "Cpu": (
+            'IRAM(0x20000000,0x00010000) IROM(0x08000000,0x00080000) CPUTYPE("Cortex-M3") CLOCK(12000000) ELITTLE'
+        ),
+        "FlashUtilSpec": "",
+        "StartupFile": "",
+        "FlashDriverDll": (
+            "UL2CM3(-S0 -C0 -P0 -FD20000000 -FC1000 -FN1 -FF0STM32F10x_512 -FS08000000 -FL080000 -FP0($$Device:STM32F103ZE$Flash\\STM32F10x_512.FLM))"
+        ),
+        "DeviceId": "0",
+        "RegisterFile": ("$$Device:STM32F103ZE$Device\\Include\\stm32f10x.h"),
+        "MemoryEnv": "",
+        "Cmp": "",
+        "Asm": "",
+        "Linker": "",
+        "OHString": "",
+        "InfinionOptionDll": "",
+        "SLE66CMisc": "",
+        "SLE66AMisc": "",
+        "SLE66LinkerMisc": "",
+        "SFDFile": "$$Device:STM32F103ZE$SVD\\STM32F103xx.svd",
+        "bCustSvd": "0",
+        "UseEnv": "0",
+        "BinPath": "",
+        "IncludePath": "",
+        "LibPath": "",
+        "RegisterFilePath": "",
+        "DBRegisterFilePath": "",
+        # target status
+        "OutputDirectory": ".\\Objects\\",
+        "OutputName": "",  # needs to be set later
+        "CreateExecutable": "1",
+        "CreateLib": "0",
+        "CreateHexFile": "1",
+        "DebugInformation": "1",
+        "BrowseInformation": "1",
+        "ListingPath": ".\\Listings\\",
+        "HexFormatSelection": "1",
+        "Merge32K": "0",
+        "CreateBatchFile": "0",
+        # before compile, before make, after make
+        "SelectedForBatchBuild": "0",
+        "SVCSIdString": "",
+    }
+    option_keys = dict.fromkeys(default_opts) | {"OutputName": None}
+    valid_keys = frozenset(
+        (
+            "TargetStatus",
+            "BeforeCompile",
+            "BeforeMake",
+            "AfterMake",
+        )
+    )
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "TargetCommonOption")
         assert self.tag == "TargetCommonOption", f"common option xml tag {self.tag}"
 
-        self.default_opts = {
-            "Device": "STM32F103ZE",
-            "Vendor": "STMicroelectronics",
-            "PackID": "Keil.STM32F1xx_DFP.2.4.1",
-            "PackURL": "https://www.keil.com/pack/",
-            "Cpu": (
-                'IRAM(0x20000000,0x00010000) IROM(0x08000000,0x00080000) CPUTYPE("Cortex-M3") CLOCK(12000000) ELITTLE'
-            ),
-            "FlashUtilSpec": "",
-            "StartupFile": "",
-            "FlashDriverDll": (
-                "UL2CM3(-S0 -C0 -P0 -FD20000000 -FC1000 -FN1 -FF0STM32F10x_512 -FS08000000 -FL080000 -FP0($$Device:STM32F103ZE$Flash\\STM32F10x_512.FLM))"
-            ),
-            "DeviceId": "0",
-            "RegisterFile": ("$$Device:STM32F103ZE$Device\\Include\\stm32f10x.h"),
-            "MemoryEnv": "",
-            "Cmp": "",
-            "Asm": "",
-            "Linker": "",
-            "OHString": "",
-            "InfinionOptionDll": "",
-            "SLE66CMisc": "",
-            "SLE66AMisc": "",
-            "SLE66LinkerMisc": "",
-            "SFDFile": "$$Device:STM32F103ZE$SVD\\STM32F103xx.svd",
-            "bCustSvd": "0",
-            "UseEnv": "0",
-            "BinPath": "",
-            "IncludePath": "",
-            "LibPath": "",
-            "RegisterFilePath": "",
-            "DBRegisterFilePath": "",
-            # target status
-            "OutputDirectory": ".\\Objects\\",
-            "OutputName": "",  # needs to be set later
-            "CreateExecutable": "1",
-            "CreateLib": "0",
-            "CreateHexFile": "1",
-            "DebugInformation": "1",
-            "BrowseInformation": "1",
-            "ListingPath": ".\\Listings\\",
-            "HexFormatSelection": "1",
-            "Merge32K": "0",
-            "CreateBatchFile": "0",
-            # before compile, before make, after make
-            "SelectedForBatchBuild": "0",
-            "SVCSIdString": "",
-        }
-        self.option_keys = dict.fromkeys(self.default_opts) | {"OutputName": None}
-        self.valid_keys = self.option_keys | dict.fromkeys(
-            (
-                "TargetStatus",
-                "BeforeCompile",
-                "BeforeMake",
-                "AfterMake",
-            )
-        )
-
-        self.load()
-
+        children = self.load()
         self.target_status = UVTargetCommonOption.TargetStatus(
-            self.find("./TargetStatus")
-        )
-        self.before_compile = UVTargetCommonOption.CostumeCommands(
-            self.find("./BeforeCompile"), "U", "BeforeCompile"
+            children.get("TargetStatus")
         )
-        self.before_make = UVTargetCommonOption.CostumeCommands(
-            self.find("./BeforeMake"), "B", "BeforeMake"
-        )
-        self.after_make = UVTargetCommonOption.CostumeCommands(
-            self.find("./AfterMake"), "A", "AfterMake"
+        self.before_compile = UVTargetCommonOption.BeforeCompile(
+            children.get("BeforeCompile")
         )
+        self.before_make = UVTargetCommonOption.BeforeMake(children.get("BeforeMake"))
+        self.after_make = UVTargetCommonOption.AfterMake(children.get("AfterMake"))
         self.subconfigs = [
             self.target_status,
             self.before_compile,
@@ -245,146 +421,152 @@ class UVTargetCommonOption(UVConfigBase):
 
 
 class UVCommonProperty(UVConfigBase):
+    __slots__ = ()
+    default_opts = {
+        "UseCPPCompiler": "0",
+        "RVCTCodeConst": "0",
+        "RVCTZI": "0",
+        "RVCTOtherData": "0",
+        "ModuleSelection": "0",
+        "IncludeInBuild": "1",
+        "AlwaysBuild": "0",
+        "GenerateAssemblyFile": "0",
+        "AssembleAssemblyFile": "0",
+        "PublicsOnly": "0",
+        "StopOnExitCode": "3",
+        "CustomArgument": "",
+        "IncludeLibraryModules": "",
+        "ComprImg": "1",
+    }
+    option_keys = dict.fromkeys(default_opts)
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "CommonProperty")
         assert self.tag == "CommonProperty", f"common property xml tag {self.tag}"
 
-        self.default_opts = {
-            "UseCPPCompiler": "0",
-            "RVCTCodeConst": "0",
-            "RVCTZI": "0",
-            "RVCTOtherData": "0",
-            "ModuleSelection": "0",
-            "IncludeInBuild": "1",
-            "AlwaysBuild": "0",
-            "GenerateAssemblyFile": "0",
-            "AssembleAssemblyFile": "0",
-            "PublicsOnly": "0",
-            "StopOnExitCode": "3",
-            "CustomArgument": "",
-            "IncludeLibraryModules": "",
-            "ComprImg": "1",
-        }
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys
-
         self.load()
 
 
 class UVDllOption(UVConfigBase):
+    __slots__ = ()
+    default_opts = {
+        "SimDllName": "SARMCM3.DLL",
+        "SimDllArguments": "-REMAP",
+        "SimDlgDll": "DCM.DLL",
+        "SimDlgDllArguments": "",
+        "TargetDllName": "SARMCM3.DLL",
+        "TargetDllArguments": "",
+        "TargetDlgDll": "TCM.DLL",
+        "TargetDlgDllArguments": "-pCM3",
+    }
+    option_keys = dict.fromkeys(default_opts)
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "DllOption")
         assert self.tag == "DllOption", f"DllOption tag {self.tag}"
 
-        self.default_opts = {
-            "SimDllName": "SARMCM3.DLL",
-            "SimDllArguments": "-REMAP",
-            "SimDlgDll": "DCM.DLL",
-            "SimDlgDllArguments": "",
-            "TargetDllName": "SARMCM3.DLL",
-            "TargetDllArguments": "",
-            "TargetDlgDll": "TCM.DLL",
-            "TargetDlgDllArguments": "-pCM3",
-        }
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys
-
         self.load()
 
 
 class UVDebugOption(UVConfigBase):
+    __slots__ = ("opthx",)
+
     class OPTHX(UVConfigBase):
+        __slots__ = ()
+        default_opts = {
+            "HexSelection": "1",
+            "HexRangeLowAddress": "0",
+            "HexRangeHighAddress": "0",
+            "HexOffset": "0",
+            "Oh166RecLen": "16",
+        }
+        option_keys = dict.fromkeys(default_opts)
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "OPTHX")
             assert self.tag == "OPTHX", f"OPTHX tag {self.tag}"
 
-            self.default_opts = {
-                "HexSelection": "1",
-                "HexRangeLowAddress": "0",
-                "HexRangeHighAddress": "0",
-                "HexOffset": "0",
-                "Oh166RecLen": "16",
-            }
-            self.option_keys = dict.fromkeys(self.default_opts)
-            self.valid_keys = self.option_keys
-
             self.load()
 
     opthx: OPTHX
 
+    valid_keys = frozenset({"OPTHX"})
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "DebugOption")
         assert self.tag == "DebugOption", f"DebugOption tag {self.tag}"
 
-        self.valid_keys = {"OPTHX": None}
-
-        self.opthx = UVDebugOption.OPTHX(self.find("./OPTHX"))
+        self.opthx = UVDebugOption.OPTHX(self._child("OPTHX"))
 
         self.subconfigs = [self.opthx]
 
 
 class UVUtilities(UVConfigBase):
+    __slots__ = ("flash1",)
+
     class Flash1(UVConfigBase):
+        __slots__ = ()
+        default_opts = {
+            "UseTargetDll": "1",
+            "UseExternalTool": "0",
+            "RunIndependent": "0",
+            "UpdateFlashBeforeDebugging": "1",
+            "Capability": "1",
+            "DriverSelection": "4101",
+        }
+        option_keys = dict.fromkeys(default_opts)
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "Flash1")
             assert self.tag == "Flash1", f"Flash1 tag {self.tag}"
 
-            self.default_opts = {
-                "UseTargetDll": "1",
-                "UseExternalTool": "0",
-                "RunIndependent": "0",
-                "UpdateFlashBeforeDebugging": "1",
-                "Capability": "1",
-                "DriverSelection": "4101",
-            }
-            self.option_keys = dict.fromkeys(self.default_opts)
-            self.valid_keys = self.option_keys
-
             self.load()
 
     flash1: Flash1
 
+    default_opts = {
+        "bUseTDR": "1",
+        "Flash2": "BIN\\UL2CM3.DLL",
+        "Flash3": "",
+        "Flash4": "",
+        "pFcarmOut": "",
+        "pFcarmGrp": "",
+        "pFcArmRoot": "",
+        "FcArmLst": "0",
+    }
+    option_keys = dict.fromkeys(default_opts)
+    valid_keys = frozenset({"Flash1"})
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "Utilities")
         assert self.tag == "Utilities", f"Utilities tag {self.tag}"
 
-        self.default_opts = {
-            "bUseTDR": "1",
-            "Flash2": "BIN\\UL2CM3.DLL",
-            "Flash3": "",
-            "Flash4": "",
-            "pFcarmOut": "",
-            "pFcarmGrp": "",
-            "pFcArmRoot": "",
-            "FcArmLst": "0",
-        }
-
-        self.option_keys = dict.fromkeys(self.default_opts)
-
-        self.valid_keys = self.option_keys | {"Flash1": None}
-
-        self.load()
+        children = self.load()
 
-        self.flash1 = UVUtilities.Flash1(self.find("./Flash1"))
+        self.flash1 = UVUtilities.Flash1(children.get("Flash1"))
 
         self.subconfigs = [self.flash1]
 
 
 class UVArmAdsMisc(UVConfigBase):
+    __slots__ = ("on_chip_memories",)
+
     class OnChipMemories(UVConfigBase):
+        __slots__ = ("ocms", "iram", "irom", "xram", "ocr_rvct")
+
         class Memory(UVConfigBase):
+            __slots__ = ()
+            default_opts = {
+                "Type": "0",
+                "StartAddress": "0x0",
+                "Size": "0x0",
+            }
+            option_keys = dict.fromkeys(default_opts)
+
             def __init__(self, elem: ET.Element | None = None, tag: str = ""):
                 super().__init__(elem if elem is not None else tag)
                 assert self.tag == tag, f"memory xml tag {self.tag}"
 
-                self.default_opts = {
-                    "Type": "0",
-                    "StartAddress": "0x0",
-                    "Size": "0x0",
-                }
-                self.option_keys = dict.fromkeys(self.default_opts)
-                self.valid_keys = self.option_keys
-
                 self.load()
 
         ocms: list[Memory]
@@ -393,255 +575,253 @@ class UVArmAdsMisc(UVConfigBase):
         xram: Memory
         ocr_rvct: list[Memory]  # represent vector
 
+        # memory slot tags are fixed, build them once
+        ocm_tags: ClassVar[tuple[str, ...]] = tuple(
+            sys.intern(f"Ocm{i}") for i in range(1, 7)
+        )
+        ocr_rvct_tags: ClassVar[tuple[str, ...]] = tuple(
+            sys.intern(f"OCR_RVCT{i}") for i in range(1, 11)
+        )
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "OnChipMemories")
             assert self.tag == "OnChipMemories", f"on chip memories xml tag {self.tag}"
 
-            self.ocms, self.rams, self.ocr_rvct = [], [], []
-            for i in range(1, 7):
-                self.ocms.append(
-                    UVArmAdsMisc.OnChipMemories.Memory(
-                        self.find(f"./Ocm{i}"), f"Ocm{i}"
-                    )
-                )
-
-            self.iram = UVArmAdsMisc.OnChipMemories.Memory(
-                self.find(f"./IRAM"), f"IRAM"
-            )
-            self.irom = UVArmAdsMisc.OnChipMemories.Memory(
-                self.find(f"./IROM"), f"IROM"
-            )
-            self.xram = UVArmAdsMisc.OnChipMemories.Memory(
-                self.find(f"./XRAM"), f"XRAM"
-            )
-
-            for i in range(1, 11):
-                self.ocr_rvct.append(
-                    UVArmAdsMisc.OnChipMemories.Memory(
-                        self.find(f"./OCR_RVCT{i}"), f"OCR_RVCT{i}"
-                    )
-                )
+            Memory = UVArmAdsMisc.OnChipMemories.Memory
+            children = self.children()
+            self.ocms = [Memory(children.get(tag), tag) for tag in self.ocm_tags]
+            self.iram = Memory(children.get("IRAM"), "IRAM")
+            self.irom = Memory(children.get("IROM"), "IROM")
+            self.xram = Memory(children.get("XRAM"), "XRAM")
+            self.ocr_rvct = [
+                Memory(children.get(tag), tag) for tag in self.ocr_rvct_tags
+            ]
             self.subconfigs = [
-                s
-                for s in (self.ocms + [self.iram, self.irom, self.xram] + self.ocr_rvct)
+                *self.ocms,
+                self.iram,
+                self.irom,
+                self.xram,
+                *self.ocr_rvct,
             ]
 
     on_chip_memories: OnChipMemories
 
+    default_opts = {
+        "GenerateListings": "0",
+        "asHll": "1",
+        "asAsm": "1",
+        "asMacX": "1",
+        "asSyms": "1",
+        "asFals": "1",
+        "asDbgD": "1",
+        "asForm": "1",
+        "ldLst": "0",
+        "ldmm": "1",
+        "ldXref": "1",
+        "BigEnd": "0",
+        "AdsALst": "1",
+        "AdsACrf": "1",
+        "AdsANop": "0",
+        "AdsANot": "0",
+        "AdsLLst": "1",
+        "AdsLmap": "1",
+        "AdsLcgr": "1",
+        "AdsLsym": "1",
+        "AdsLszi": "1",
+        "AdsLtoi": "1",
+        "AdsLsun": "1",
+        "AdsLven": "1",
+        "AdsLsxf": "1",
+        "RvctClst": "0",
+        "GenPPlst": "0",
+        "AdsCpuType": '"Cortex-M3"',
+        "RvctDeviceName": "",
+        "mOS": "0",
+        "uocRom": "0",
+        "uocRam": "0",
+        "hadIROM": "1",
+        "hadIRAM": "1",
+        "hadXRAM": "0",
+        "uocXRam": "0",
+        "RvdsVP": "0",
+        "RvdsMve": "0",
+        "RvdsCdeCp": "0",
+        "nBranchProt": "0",
+        "hadIRAM2": "0",
+        "hadIROM2": "0",
+        "StupSel": "8",
+        "useUlib": "0",
+        "EndSel": "0",
+        "uLtcg": "0",
+        "nSecure": "0",
+        "RoSelD": "3",
+        "RwSelD": "3",
+        "CodeSel": "0",
+        "OptFeed": "0",
+        "NoZi1": "0",
+        "NoZi2": "0",
+        "NoZi3": "0",
+        "NoZi4": "0",
+        "NoZi5": "0",
+        "Ro1Chk": "0",
+        "Ro2Chk": "0",
+        "Ro3Chk": "0",
+        "Ir1Chk": "1",
+        "Ir2Chk": "0",
+        "Ra1Chk": "0",
+        "Ra2Chk": "0",
+        "Ra3Chk": "0",
+        "Im1Chk": "1",
+        "Im2Chk": "0",
+        "RvctStartVector": "",
+    }
+    option_keys = dict.fromkeys(default_opts)
+    valid_keys = frozenset({"OnChipMemories"})
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "ArmAdsMisc")
         assert self.tag == "ArmAdsMisc", f"target arm ads xml tag {self.tag}"
 
-        self.default_opts = {
-            "GenerateListings": "0",
-            "asHll": "1",
-            "asAsm": "1",
-            "asMacX": "1",
-            "asSyms": "1",
-            "asFals": "1",
-            "asDbgD": "1",
-            "asForm": "1",
-            "ldLst": "0",
-            "ldmm": "1",
-            "ldXref": "1",
-            "BigEnd": "0",
-            "AdsALst": "1",
-            "AdsACrf": "1",
-            "AdsANop": "0",
-            "AdsANot": "0",
-            "AdsLLst": "1",
-            "AdsLmap": "1",
-            "AdsLcgr": "1",
-            "AdsLsym": "1",
-            "AdsLszi": "1",
-            "AdsLtoi": "1",
-            "AdsLsun": "1",
-            "AdsLven": "1",
-            "AdsLsxf": "1",
-            "RvctClst": "0",
-            "GenPPlst": "0",
-            "AdsCpuType": '"Cortex-M3"',
-            "RvctDeviceName": "",
-            "mOS": "0",
-            "uocRom": "0",
-            "uocRam": "0",
-            "hadIROM": "1",
-            "hadIRAM": "1",
-            "hadXRAM": "0",
-            "uocXRam": "0",
-            "RvdsVP": "0",
-            "RvdsMve": "0",
-            "RvdsCdeCp": "0",
-            "nBranchProt": "0",
-            "hadIRAM2": "0",
-            "hadIROM2": "0",
-            "StupSel": "8",
-            "useUlib": "0",
-            "EndSel": "0",
-            "uLtcg": "0",
-            "nSecure": "0",
-            "RoSelD": "3",
-            "RwSelD": "3",
-            "CodeSel": "0",
-            "OptFeed": "0",
-            "NoZi1": "0",
-            "NoZi2": "0",
-            "NoZi3": "0",
-            "NoZi4": "0",
-            "NoZi5": "0",
-            "Ro1Chk": "0",
-            "Ro2Chk": "0",
-            "Ro3Chk": "0",
-            "Ir1Chk": "1",
-            "Ir2Chk": "0",
-            "Ra1Chk": "0",
-            "Ra2Chk": "0",
-            "Ra3Chk": "0",
-            "Im1Chk": "1",
-            "Im2Chk": "0",
-            "RvctStartVector": "",
-        }
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys | {"OnChipMemories": None}
-
-        self.load()
+        children = self.load()
 
         self.on_chip_memories = UVArmAdsMisc.OnChipMemories(
-            self.find("./OnChipMemories")
+            children.get("OnChipMemories")
         )
         self.subconfigs = [self.on_chip_memories]
 
 
 class UVVariousControls(UVConfigBase):
+    __slots__ = ()
+    default_opts = {
+        "MiscControls": "",
+        "Define": "",
+        "Undefine": "",
+        "IncludePath": "",
+    }
+    option_keys = dict.fromkeys(default_opts)
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "VariousControls")
         assert self.tag == "VariousControls", f"various controls xml tag {self.tag}"
 
-        self.default_opts = {
-            "MiscControls": "",
-            "Define": "",
-            "Undefine": "",
-            "IncludePath": "",
-        }
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys
-
         self.load()
 
 
 class UVCads(UVConfigBase):  # compiler arm developer suite
+    __slots__ = ("various_controls",)
     various_controls: UVVariousControls
 
+    default_opts = {
+        "interw": "1",
+        "Optim": "1",
+        "oTime": "0",
+        "SplitLS": "0",
+        "OneElfS": "1",
+        "Strict": "0",
+        "EnumInt": "0",
+        "PlainCh": "0",
+        "Ropi": "0",
+        "Rwpi": "0",
+        "wLevel": "2",
+        "uThumb": "0",
+        "uSurpInc": "0",
+        "uC99": "1",
+        "uGnu": "1",
+        "useXO": "0",
+        "v6Lang": "5",
+        "v6LangP": "3",
+        "vShortEn": "1",
+        "vShortWch": "1",
+        "v6Lto": "0",
+        "v6WtE": "0",
+        "v6Rtti": "0",
+    }
+    option_keys = dict.fromkeys(default_opts)
+    valid_keys = frozenset({"VariousControls"})
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "Cads")
         assert self.tag == "Cads", f"cads xml tag {self.tag}"
 
-        self.default_opts = {
-            "interw": "1",
-            "Optim": "1",
-            "oTime": "0",
-            "SplitLS": "0",
-            "OneElfS": "1",
-            "Strict": "0",
-            "EnumInt": "0",
-            "PlainCh": "0",
-            "Ropi": "0",
-            "Rwpi": "0",
-            "wLevel": "2",
-            "uThumb": "0",
-            "uSurpInc": "0",
-            "uC99": "1",
-            "uGnu": "1",
-            "useXO": "0",
-            "v6Lang": "5",
-            "v6LangP": "3",
-            "vShortEn": "1",
-            "vShortWch": "1",
-            "v6Lto": "0",
-            "v6WtE": "0",
-            "v6Rtti": "0",
-        }
-
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys | {"VariousControls": None}
-
-        self.load()
+        children = self.load()
 
-        self.various_controls = UVVariousControls(self.find("./VariousControls"))
+        self.various_controls = UVVariousControls(children.get("VariousControls"))
         self.subconfigs = [self.various_controls]
 
 
 class UVAads(UVConfigBase):  # assembler arm developer suite
+    __slots__ = ("various_controls",)
     various_controls: UVVariousControls
 
+    default_opts = {
+        "interw": "1",
+        "Ropi": "0",
+        "Rwpi": "0",
+        "thumb": "0",
+        "SplitLS": "0",
+        "SwStkChk": "0",
+        "NoWarn": "0",
+        "uSurpInc": "0",
+        "useXO": "0",
+        "ClangAsOpt": "1",
+    }
+    option_keys = dict.fromkeys(default_opts)
+    valid_keys = frozenset({"VariousControls"})
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "Aads")
         assert self.tag == "Aads", f"aads xml tag {self.tag}"
 
-        self.default_opts = {
-            "interw": "1",
-            "Ropi": "0",
-            "Rwpi": "0",
-            "thumb": "0",
-            "SplitLS": "0",
-            "SwStkChk": "0",
-            "NoWarn": "0",
-            "uSurpInc": "0",
-            "useXO": "0",
-            "ClangAsOpt": "1",
-        }
-
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys | {"VariousControls": None}
-
-        self.load()
+        children = self.load()
 
-        self.various_controls = UVVariousControls(self.find("./VariousControls"))
+        self.various_controls = UVVariousControls(children.get("VariousControls"))
         self.subconfigs = [self.various_controls]
 
 
 class UVLDads(UVConfigBase):  # linker arm developer suite
+    __slots__ = ()
     various_controls: UVVariousControls
 
+    default_opts = {
+        "umfTarg": "1",
+        "Ropi": "0",
+        "Rwpi": "0",
+        "noStLib": "0",
+        "RepFail": "1",
+        "useFile": "0",
+        "TextAddressRange": "0x08000000",
+        "DataAddressRange": "0x20000000",
+        "pXoBase": "",
+        "ScatterFile": "",
+        "IncludeLibs": "",
+        "IncludeLibsPath": "",
+        "Misc": "",
+        "LinkerInputFile": "",
+        "DisabledWarnings": "",
+    }
+    option_keys = dict.fromkeys(default_opts)
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "LDads")
         assert self.tag == "LDads", f"lads xml tag {self.tag}"
 
-        self.default_opts = {
-            "umfTarg": "1",
-            "Ropi": "0",
-            "Rwpi": "0",
-            "noStLib": "0",
-            "RepFail": "1",
-            "useFile": "0",
-            "TextAddressRange": "0x08000000",
-            "DataAddressRange": "0x20000000",
-            "pXoBase": "",
-            "ScatterFile": "",
-            "IncludeLibs": "",
-            "IncludeLibsPath": "",
-            "Misc": "",
-            "LinkerInputFile": "",
-            "DisabledWarnings": "",
-        }
-
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys
-
         self.load()
 
 
 class UVGroup(UVConfigBase):
+    __slots__ = ("files",)
 
     class Files(UVConfigBase):
+        __slots__ = ("files",)
+
         class File(UVConfigBase):
+            __slots__ = ()
+            option_keys = dict.fromkeys(("FileName", "FileType", "FilePath"))
+
             def __init__(self, elem: ET.Element | None = None) -> None:
                 super().__init__(elem if elem is not None else "File")
                 assert self.tag == "File", f"file xml tag {self.tag}"
 
-                self.option_keys = dict.fromkeys(("FileName", "FileType", "FilePath"))
-                self.valid_keys = self.option_keys
-
                 self.load()
 
             @property
@@ -650,48 +830,63 @@ class UVGroup(UVConfigBase):
 
             @path.setter
             def path(self, val: str):
+                self.options.update(self.path_options(val))
+
+            @staticmethod
+            def path_options(val: str) -> dict[str, str]:
                 assert isinstance(val, str) and not os.path.isabs(
                     val
                 ), f"file invalid path {val}"
-                self.options["FilePath"] = val
-                self.options["FileName"] = os.path.basename(val)
-                # needs amendment
-                self.options["FileType"] = "1" if val.endswith(".c") else "2"
+                return {
+                    "FileName": os.path.basename(val),
+                    # needs amendment
+                    "FileType": "1" if val.endswith(".c") else "2",
+                    "FilePath": val,
+                }
+
+            # build the element with its options, so load finds them all
+            @classmethod
+            def from_path(cls, val: str) -> "UVGroup.Files.File":
+                elem = ET.Element("File")
+                for key, text in cls.path_options(val).items():
+                    ET.SubElement(elem, key).text = text
+                return cls(elem)
 
         files: list[File]
 
+        valid_keys = frozenset({"File"})
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "Files")
             assert self.tag == "Files"
 
-            self.valid_keys = {"File": None}
-
             self.files = []
-            for elem in self.iterfind("./File"):
+            for elem in self._children_with("File"):
                 self.files.append(UVGroup.Files.File(elem))
-            self.subconfigs = [f for f in self.files]
+            self.subconfigs = list(self.files)
 
         def add_file(self, fn: str):
-            f = UVGroup.Files.File()
-            f.path = fn
-            self.files.append(f)
-            self.subconfigs.append(f)
+            self.add_files((fn,))
+
+        def add_files(self, fns: Iterable[str]):
+            new = [UVGroup.Files.File.from_path(fn) for fn in fns]
+            self._elem.extend(f._elem for f in new)
+            self.files.extend(new)
+            self.subconfigs.extend(new)
 
     files: Files
 
+    default_opts = {"GroupName": "DefaultGroupName"}
+    option_keys = {"GroupName": None}
+    lazy_subconfigs = {"files": ("Files", Files)}
+    valid_keys = frozenset({"Files"})
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "Group")
         assert self.tag == "Group", f"group xml tag {self.tag}"
 
-        self.default_opts = {"GroupName": "DefaultGroupName"}
-        self.option_keys = {"GroupName": None}
-        self.valid_keys = self.option_keys | {"Files": None}
-
         self.load()
 
-        self.files = UVGroup.Files(self.find("./Files"))
-        self.subconfigs = [self.files]
-
     @property
     def name(self) -> str:
         return self.options["GroupName"]
@@ -703,25 +898,37 @@ class UVGroup(UVConfigBase):
 
 
 class UVTarget(UVConfigBase):
+    __slots__ = ("targ_opt", "groups")
+
     class TargetOption(UVConfigBase):
+        __slots__ = (
+            "common_opt",
+            "common_prop",
+            "dll_opt",
+            "dbg_opt",
+            "util",
+            "arm_ads",
+        )
+
         class TargetArmAds(UVConfigBase):
+            __slots__ = ("misc_ads", "compiler_ads", "assembler_ads", "linker_ads")
 
             misc_ads: UVArmAdsMisc
             compiler_ads: UVCads
             assembler_ads: UVAads
             linker_ads: UVLDads
 
+            valid_keys = frozenset(("ArmAdsMisc", "Cads", "Aads", "LDads"))
+
             def __init__(self, elem: ET.Element | None = None) -> None:
                 super().__init__(elem if elem is not None else "TargetArmAds")
                 assert self.tag == "TargetArmAds"
-                self.valid_keys = dict.fromkeys(("ArmAdsMisc", "Cads", "Aads", "LDads"))
 
-                self.load()
-
-                self.misc_ads = UVArmAdsMisc(self.find("./ArmAdsMisc"))
-                self.compiler_ads = UVCads(self.find("./Cads"))
-                self.assembler_ads = UVAads(self.find("./Aads"))
-                self.linker_ads = UVLDads(self.find("./LDads"))
+                children = self.load()
+                self.misc_ads = UVArmAdsMisc(children.get("ArmAdsMisc"))
+                self.compiler_ads = UVCads(children.get("Cads"))
+                self.assembler_ads = UVAads(children.get("Aads"))
+                self.linker_ads = UVLDads(children.get("LDads"))
 
                 self.subconfigs = [
                     self.misc_ads,
@@ -737,94 +944,80 @@ class UVTarget(UVConfigBase):
         util: UVUtilities
         arm_ads: TargetArmAds
 
+        # most callers only touch common_opt and arm_ads
+        lazy_subconfigs = {
+            "common_opt": ("TargetCommonOption", UVTargetCommonOption),
+            "common_prop": ("CommonProperty", UVCommonProperty),
+            "dll_opt": ("DllOption", UVDllOption),
+            "dbg_opt": ("DebugOption", UVDebugOption),
+            "util": ("Utilities", UVUtilities),
+            "arm_ads": ("TargetArmAds", TargetArmAds),
+        }
+        valid_keys = frozenset(tag for tag, _ in lazy_subconfigs.values())
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "TargetOption")
             assert self.tag == "TargetOption"
 
-            self.valid_keys = dict.fromkeys(
-                (
-                    "TargetCommonOption",
-                    "CommonProperty",
-                    "DllOption",
-                    "DebugOption",
-                    "Utilities",
-                    "TargetArmAds",
-                )
-            )
-
             self.load()
 
-            self.common_opt = UVTargetCommonOption(self.find("./TargetCommonOption"))
-            self.common_prop = UVCommonProperty(self.find("./CommonProperty"))
-            self.dll_opt = UVDllOption(self.find("./DllOption"))
-            self.dbg_opt = UVDebugOption(self.find("./DebugOption"))
-            self.util = UVUtilities(self.find("./Utilities"))
-            self.arm_ads = UVTarget.TargetOption.TargetArmAds(
-                self.find("./TargetArmAds")
-            )
-
-            self.subconfigs = [
-                self.common_opt,
-                self.common_prop,
-                self.dll_opt,
-                self.dbg_opt,
-                self.util,
-                self.arm_ads,
-            ]
-
     targ_opt: TargetOption
 
     class Groups(UVConfigBase):
+        __slots__ = ("groups", "_group_names", "_group_name_set")
         groups: list[UVGroup]
         _group_names: list[str]
+        _group_name_set: set[str]  # membership, the list keeps order
+
+        valid_keys = frozenset({"Group"})
 
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "Groups")
-            self.valid_keys = {"Group": None}
 
             self.load()
 
             self.groups = []
-            for elem in self.iterfind("./Group"):
+            for elem in self._children_with("Group"):
                 self.groups.append(UVGroup(elem))
 
-            self.subconfigs = [g for g in self.groups]
+            self.subconfigs = list(self.groups)
 
             self._group_names = [g.name for g in self.groups]
+            self._group_name_set = set(self._group_names)
 
         @property
         def group_names(self):
             return tuple(self._group_names)
 
         def add_group(self, group: UVGroup):
-            assert not group.name in self._group_names, f"{group.name} exists"
+            assert not group.name in self._group_name_set, f"{group.name} exists"
             self.groups.append(group)
             self.subconfigs.append(group)
             self._group_names.append(group.name)
+            self._group_name_set.add(group.name)
 
     groups: Groups
 
+    default_opts = {
+        "ToolsetNumber": "0x4",
+        "ToolsetName": "ARM_ADS",
+        "pCCUsed": "6240000::V6.24::ARMCLANG",
+        "uAC6": "1",
+        "TargetName": "DefaultTargetName",
+    }
+    option_keys = dict.fromkeys(default_opts)
+    lazy_subconfigs = {
+        "targ_opt": ("TargetOption", TargetOption),
+        "groups": ("Groups", Groups),
+    }
+    valid_keys = frozenset({"TargetOption", "Groups"})
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "Target")
         assert self.tag == "Target", f"target xml tag {self.tag}"
 
-        self.default_opts = {
-            "ToolsetNumber": "0x4",
-            "ToolsetName": "ARM_ADS",
-            "pCCUsed": "6240000::V6.24::ARMCLANG",
-            "uAC6": "1",
-            "TargetName": "DefaultTargetName",
-        }
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys | {"TargetOption": None, "Groups": None}
-
         self.load()
 
-        self.targ_opt = UVTarget.TargetOption(self.find("./TargetOption"))
-        self.groups = UVTarget.Groups(self.find("./Groups"))
-
-        self.subconfigs = [self.targ_opt, self.groups]
-
     @property
     def name(self) -> str:
         return self.options["TargetName"]
@@ -838,134 +1031,167 @@ class UVTarget(UVConfigBase):
 
 
 class UVRTE(UVConfigBase):
+    __slots__ = ()
+    option_keys = dict.fromkeys(("apis", "components", "files"))
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "RTE")
         assert self.tag == "RTE", f"RTE xml tag {self.tag}"
-        self.option_keys = self.valid_keys = dict.fromkeys(
-            ("apis", "components", "files")
-        )
 
         self.load()
 
 
 class UVLayer(UVConfigBase):
+    __slots__ = ()
+    option_keys = {"LayName": None, "LayPrjMark": None}
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "Layer")
         assert self.tag == "Layer", f"layer xml tag {self.tag}"
-        self.option_keys = self.valid_keys = {"LayName": None, "LayPrjMark": None}
 
         self.load()
 
 
 class UVProject(UVConfigBase):
+    __slots__ = ("targets", "rte_info", "layers")
+
     class Targets(UVConfigBase):
+        __slots__ = ("targets", "_target_names", "_target_name_set")
         targets: list[UVTarget]
         _target_names: list[str]
+        _target_name_set: set[str]  # membership, the list keeps order
+
+        valid_keys = frozenset({"Target"})
 
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "Targets")
             assert self.tag == "Targets"
 
-            self.valid_keys = {"Target": None}
-
             self.load()
 
             self.targets = []
-            for elem in self.iterfind("./Target"):
+            for elem in self._children_with("Target"):
                 self.targets.append(UVTarget(elem))
             if not self.targets:
                 warn("no target found, adding a default target")
                 self.targets.append(UVTarget(None))
 
-            self.subconfigs = [t for t in self.targets]
+            self.subconfigs = list(self.targets)
 
             self._target_names = [targ.name for targ in self.targets]
+            self._target_name_set = set(self._target_names)
 
         @property
         def target_names(self) -> list[str]:
             return self._target_names
 
         def add_target(self, targ: UVTarget):
-            assert not targ.name in self._target_names, f"target {targ.name} exists"
+            assert not targ.name in self._target_name_set, f"target {targ.name} exists"
             self.targets.append(targ)
             self.subconfigs.append(targ)
-            self.target_names.append(targ.name)
+            self._target_names.append(targ.name)
+            self._target_name_set.add(targ.name)
 
     class Layers(UVConfigBase):
+        __slots__ = ("layers",)
         layers: list[UVLayer]
 
+        valid_keys = frozenset({"Layer"})
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "Layers")
             assert self.tag == "Layers"
 
-            self.valid_keys = {"Layer": None}
             self.load()
 
             self.layers = []
-            for elem in self.iterfind("./Layer"):
+            for elem in self._children_with("Layer"):
                 self.layers.append(UVLayer(elem))
-            self.subconfigs = [l for l in self.layers]
+            self.subconfigs = list(self.layers)
 
     class LayerInfo(UVConfigBase):
+        __slots__ = ("layers",)
         # layers: 'Layers'
+        valid_keys = frozenset({"Layers"})
+
         def __init__(self, elem: ET.Element | None = None) -> None:
             super().__init__(elem if elem is not None else "LayerInfo")
             assert self.tag == "LayerInfo"
-            self.valid_keys = {"Layers": None}
 
             self.load()
 
-            self.layers = UVProject.Layers(self.find("./Layers"))
-            self.subconfigs = [self.layers]
-
     targets: Targets
     rte_info: UVRTE
     layers: LayerInfo
 
+    default_opts = {
+        "SchemaVersion": "2.1",
+        "Header": "### uVision Project, (C) Keil Software",
+    }
+    option_keys = dict.fromkeys(default_opts)
+    lazy_subconfigs = {
+        "targets": ("Targets", Targets),
+        "rte_info": ("RTE", UVRTE),
+        "layers": ("LayerInfo", LayerInfo),
+    }
+    valid_keys = frozenset(("Targets", "RTE", "LayerInfo"))
+
     def __init__(self, elem: ET.Element | None = None) -> None:
         super().__init__(elem if elem is not None else "Project")
         assert self.tag == "Project", f"project xml tag {self.tag}"
 
-        self.default_opts = {
-            "SchemaVersion": "2.1",
-            "Header": "### uVision Project, (C) Keil Software",
-        }
-        self.option_keys = dict.fromkeys(self.default_opts)
-        self.valid_keys = self.option_keys | dict.fromkeys(
-            ("Targets", "RTE", "LayerInfo")
-        )
-
         self.load()
 
-        # self.targets, self.layers = [], []
-
-        self.targets = UVProject.Targets(self.find("./Targets"))
-        self.rte_info = UVRTE(self.find("./RTE"))
-        self.layers = UVProject.LayerInfo(self.find("./LayerInfo"))
-
-        self.subconfigs = [self.targets, self.rte_info, self.layers]
-
-        self.link()
+    @classmethod
+    def from_path(cls, path: str) -> "UVProject":
+        # stream-parse the project; whitespace between elements is dropped as
+        # each element closes. subtrees are kept since configs alias them.
+        # stdlib tags are interned so they compare by identity with the key
+        # tables, lxml builds a fresh str per .tag access so it is skipped.
+        root: ET.Element | None = None
+        if HAS_LXML:
+            # comments would show up as children with a non-str tag
+            events = ET.iterparse(path, events=("end",), remove_comments=True)
+        else:
+            events = ET.iterparse(path, events=("end",))
+        intern = sys.intern
+        for _, elem in events:
+            if not HAS_LXML:
+                elem.tag = intern(elem.tag)
+            elem.tail = None
+            if len(elem) and elem.text is not None and not elem.text.strip():
+                elem.text = None
+            root = elem
+        assert root is not None, f"empty project file {path}"
+        return cls(root)
 
     def write(self, fn: str):
+        # write the fragments as they are, without joining a copy of the file
         with open(fn, "w", encoding="utf8") as f:
-            # f.write('<?xml version="1.0" encoding="UTF-8" standalone="no" ?>\n')
-            f.write(repr(self))
+            f.writelines(self.repr_parts())
+
+    def repr_parts(self) -> list[str]:
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="no" ?>\n',
+            '<Project xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" ',
+            'xsi:noNamespaceSchemaLocation="project_projx.xsd">\n',
+        ]
+        self.repr_into(parts, 0, False)
+        parts.append("</Project>\n")
+        return parts
 
     def __repr__(self, *_) -> str:
-        rep = '<?xml version="1.0" encoding="UTF-8" standalone="no" ?>\n'
-        rep += '<Project xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
-        rep += 'xsi:noNamespaceSchemaLocation="project_projx.xsd">\n'
-        rep += super().__repr__(0, False)
-        rep += "</Project>\n"
-        return rep
+        return "".join(self.repr_parts())
+
+
+# UVProject.Layers is not visible from the LayerInfo class body
+UVProject.LayerInfo.lazy_subconfigs = {"layers": ("Layers", UVProject.Layers)}
 
 
 def test_config():
     cand = glob.glob("./*.uvprojx")[0]
     print(cand)
-    tree = ET.parse("./tmp3.uvprojx")
-    proj = UVProject(tree.getroot())
+    proj = UVProject.from_path("./tmp3.uvprojx")
     # proj = UVPorject(None)
 
     proj.sync_options()
@@ -981,8 +1207,7 @@ def test_config():
 def test_config2():
     cand = glob.glob("./*.uvprojx")[0]
     print(cand)
-    tree = ET.parse(cand)
-    proj = UVProject(tree.getroot())
+    proj = UVProject.from_path(cand)
     print(proj)
     proj.sync_options()
 
@@ -1,14 +1,14 @@
 import os
-import argparse
+import functools
 import sys
 import glob
-import subprocess
 from warnings import warn
 import re
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import filecmp
+import shutil
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
-import re
 
 from . import default_dat
 
@@ -35,22 +35,12 @@ from . import default_dat
 #   D:\program2\ARMKeil_v5_packs\Keil\STM32F1xx_DFP\2.4.1\Device\Source\system_stm32f10x.c
 
 print_lock = threading.Lock()
-mkdir_lock = threading.Lock()
 
 
-def run_command(cmd: list[str]):
-    try:
-        proc = subprocess.run(cmd, capture_output=True)
-    except Exception as e:
-        print(f"\033[38;5;9mfailed command {cmd} with error: {e}\033[0m")
-        input()
-        return
-    with print_lock:
-        print(
-            f'\033[38;5;10m>> {" ".join(cmd)}: {proc.returncode}'
-            f"(\033[38;5;9m{proc.stderr.decode()}\033[38;5;10m)\033[0m",
-            flush=True,
-        )
+# one worker pool shared by every copy phase, created on first use
+@functools.cache
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
 
 
 def compare_file(src_raw: str, dst: str) -> bool:
@@ -65,13 +55,12 @@ def compare_file(src_raw: str, dst: str) -> bool:
     return True
 
 
-def copy_file_with_repl(src: str, dst: str, repls: list[tuple[str, str]]):
+def copy_file_with_repl(src: str, dst: str, repls: list[tuple[re.Pattern | str, str]]):
     if not os.path.isfile(src):
         with print_lock:
             print(f"\033[38;5;9m>> {src} not exists\033[0m", flush=True)
         return
-    with mkdir_lock:
-        os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
     if not (os.path.isfile(dst) or os.path.isdir(os.path.dirname(dst))):
         with print_lock:
             print(
@@ -103,18 +92,58 @@ def copy_file_with_repl(src: str, dst: str, repls: list[tuple[str, str]]):
             print(f"\033[38;5;10m(up-to-date, {msg}) {src} -> {dst}\033[0m")
 
 
+# register asm bindings are swapped for a host register in the stub, and back
+TO_STUB_REPLS = [(re.compile(r'__asm__\("(r\d+)"\)'), r'__asm__("eax") /*\1*/')]
+FROM_STUB_REPLS = [(re.compile(r'__asm__\("eax"\) /\*(r\d+)\*/'), r'__asm__("\1")')]
+
+
 def copy_file_to_stub(src: str, dst: str):
-    repls = [(r'__asm__\("(r\d+)"\)', r'__asm__("eax") /*\1*/')]
-    copy_file_with_repl(src, dst, repls)
+    copy_file_with_repl(src, dst, TO_STUB_REPLS)
 
 
 def copy_file_from_stub(src: str, dst: str):
-    repls = [(r'__asm__\("eax"\) /\*(r\d+)\*/', r'__asm__("\1")')]
-    copy_file_with_repl(src, dst, repls)
+    copy_file_with_repl(src, dst, FROM_STUB_REPLS)
 
 
-def copy_file(src: str, dst: str):
-    CHUNK_SIZE = 4096
+# first .uvprojx in d (listing order, hidden files skipped like glob), or None
+def find_uvprojx(d: str) -> str | None:
+    try:
+        it = os.scandir(d)
+    except OSError:
+        return None
+    with it:
+        for e in it:
+            if (
+                e.name.endswith(".uvprojx")
+                and not e.name.startswith(".")
+                and e.is_file()
+            ):
+                return e.path
+    return None
+
+
+# copy cache: dst -> [src signature, dst signature] of the last verified copy,
+# so unchanged pairs are skipped without reading either file
+def file_sig(fn: str) -> list[int]:
+    st = os.stat(fn)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_copy_cache(fn: str) -> dict[str, list[list[int]]]:
+    try:
+        with open(fn, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_copy_cache(fn: str, cache: dict[str, list[list[int]]]):
+    with open(fn, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+
+def copy_file(src: str, dst: str, cache: dict[str, list[list[int]]] | None = None):
     if not os.path.isfile(src):
         with print_lock:
             print(
@@ -122,8 +151,7 @@ def copy_file(src: str, dst: str):
                 flush=True,
             )
         return
-    with mkdir_lock:
-        os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
     if not (
         os.path.isfile(dst) or os.path.isdir(dst) or os.path.isdir(os.path.dirname(dst))
     ):
@@ -136,44 +164,70 @@ def copy_file(src: str, dst: str):
     if os.path.isdir(dst):
         dst = os.path.normpath(dst + "/" + os.path.basename(src))
 
-    # compare file content
-    needs_copy = True
-    if os.path.isfile(dst) and os.path.getsize(src) == os.path.getsize(dst):
-        needs_copy = False
-        with open(src, "rb") as fsrc, open(dst, "rb") as fdst:
-            while not fsrc.peek() != b"" and fdst.peek() != b"":
-                hash_src, hash_dst = hash(fsrc.read(CHUNK_SIZE)), hash(
-                    fdst.read(CHUNK_SIZE)
-                )
-                if hash_src != hash_dst:
-                    needs_copy = True
-                    break
+    if cache is not None and os.path.isfile(dst):
+        if cache.get(dst) == [file_sig(src), file_sig(dst)]:
+            with print_lock:
+                print(f"\033[38;5;10m>>Copy-File: cached: {dst}\033[0m", flush=True)
+            return
+
+    # compare file content, byte-wise with early exit (sizes are checked first)
+    needs_copy = not (os.path.isfile(dst) and filecmp.cmp(src, dst, shallow=False))
+    err_msg = ""
     if not needs_copy:
         with print_lock:
             print(f"\033[38;5;10m>>Copy-File: up-to-date: {dst}\033[0m", flush=True)
     else:
-        run_command(["cp", os.path.normpath(src), os.path.normpath(dst)])
+        # shutil copies in-kernel where the platform allows (sendfile on linux),
+        # dst is a file path here so copyfile skips the mode copy of copy()
+        try:
+            shutil.copyfile(src, dst)
+        except OSError as e:
+            err_msg = str(e)
+        with print_lock:
+            print(
+                f"\033[38;5;10m>>Copy-File {os.path.normpath(src)} -> "
+                f"{os.path.normpath(dst)}: (\033[38;5;9m{err_msg}\033[38;5;10m)\033[0m",
+                flush=True,
+            )
+    # only verified pairs are cached, a failed copy is retried next run
+    if cache is not None:
+        if err_msg:
+            cache.pop(dst, None)
+        else:
+            cache[dst] = [file_sig(src), file_sig(dst)]
+
+
+# SPL still uses NVIC->IP, renamed NVIC->IPR in newer CMSIS cores
+NVIC_IP_PATTERN = re.compile(r"NVIC\s*->IP\s*", re.MULTILINE | re.ASCII)
 
 
 def content_replace(fn: str, matching: re.Pattern | str, replacement: str):
     err_msg: str = ""
     fn = os.path.normpath(fn)
+    # precompiled patterns keep their own flags
+    if isinstance(matching, str):
+        matching = re.compile(matching, re.MULTILINE | re.ASCII)
     try:
         with open(fn, "r", encoding="utf-8") as f:
             data = f.read()
-        data = re.sub(matching, replacement, data, flags=re.MULTILINE | re.ASCII)
-        with open(fn, "w", encoding="utf-8") as f:
-            f.write(data)
+        data, n_subs = matching.subn(replacement, data)
+        # leave files without matches untouched
+        if n_subs:
+            with open(fn, "w", encoding="utf-8") as f:
+                f.write(data)
     except Exception as e:
         err_msg = f"{type(e),str(e)}"
     print(
-        f"\033[38;5;10m>>Replace-Content {fn} from {matching} to {replacement}: "
+        f"\033[38;5;10m>>Replace-Content {fn} from {matching.pattern} to {replacement}: "
         f"(\033[38;5;9m{err_msg}\033[38;5;10m)\033[0m",
         flush=True,
     )
 
 
 def parse_args(args: list[str]) -> dict:
+    # argparse is only paid for by commands that parse arguments
+    import argparse
+
     default_stsd = (
         os.environ["ARG_STSOFTWARE"] if "ARG_STSOFTWARE" in os.environ else ""
     )
@@ -265,7 +319,6 @@ def parse_args(args: list[str]) -> dict:
 
 
 def bootstrap(args: dict):
-    EXEC_MAX_WORKERS = 8
     st_software_dir = args["st_software_dir"]
     project_dir = args["project_dir"]
     keil_pack_dir = args["keil_pack_dir"]
@@ -275,7 +328,7 @@ def bootstrap(args: dict):
     amend_spl = args["amend_spl"]
 
     assert (
-        len(glob.glob(project_dir + "/*.uvprojx")) > 0
+        find_uvprojx(project_dir) is not None
     ), f"{project_dir} is not a keil project dir"
 
     print("finding spl")
@@ -310,40 +363,37 @@ def bootstrap(args: dict):
     print("bootstrapping")
     lib_dest = os.path.normpath(project_dir + "/Lib/")
     spl_dest = os.path.normpath(lib_dest + "/SPL/")
-    cmsis_dest = os.path.normpath(lib_dest + "/CMSIS/")
     cmsis_core_dest = os.path.normpath(lib_dest + "/CMSIS/Core/")
     cmsis_core_ex_dest = os.path.normpath(lib_dest + "/CMSIS/Core/m-profile/")
     dfp_dest = os.path.normpath(lib_dest + "/CMSIS/DFP/")
 
-    with ThreadPoolExecutor(max_workers=EXEC_MAX_WORKERS) as e:
-        e.submit(run_command, ["mkdir", lib_dest])
-    with ThreadPoolExecutor(max_workers=EXEC_MAX_WORKERS) as e:
-        e.submit(run_command, ["mkdir", spl_dest])
-        e.submit(run_command, ["mkdir", cmsis_dest])
-    with ThreadPoolExecutor(max_workers=EXEC_MAX_WORKERS) as e:
-        e.submit(run_command, ["mkdir", cmsis_core_dest])
-        e.submit(run_command, ["mkdir", dfp_dest])
-    with ThreadPoolExecutor(max_workers=EXEC_MAX_WORKERS) as e:
-        e.submit(run_command, ["mkdir", cmsis_core_ex_dest])
-
-    with ThreadPoolExecutor(max_workers=EXEC_MAX_WORKERS) as e:
-        for spl in spl_src + spl_inc:
-            e.submit(copy_file, os.path.normpath(spl), spl_dest)
-        for inc in dfp_inc:
-            e.submit(copy_file, os.path.normpath(inc), dfp_dest)
-        for inc in cmsis_core_h:
-            e.submit(copy_file, os.path.normpath(inc), cmsis_core_dest)
-        for inc in cmsis_core_h_ex:
-            e.submit(copy_file, os.path.normpath(inc), cmsis_core_ex_dest)
-        for src in cmsis_core_src:
-            e.submit(copy_file, os.path.normpath(src), cmsis_core_dest)
-
-        e.submit(copy_file, dfp_sysinit, dfp_dest)
-        e.submit(copy_file, dfp_startup, dfp_dest)
+    # makedirs creates the parents too, and each call is a single syscall per level
+    for d in (spl_dest, cmsis_core_ex_dest, dfp_dest):
+        os.makedirs(d, exist_ok=True)
+
+    cache_fn = os.path.normpath(lib_dest + "/.uvhelper-cache.json")
+    cache = load_copy_cache(cache_fn)
+    copies: list[tuple[str, str]] = [
+        *((spl, spl_dest) for spl in spl_src + spl_inc),
+        *((inc, dfp_dest) for inc in dfp_inc),
+        *((inc, cmsis_core_dest) for inc in cmsis_core_h),
+        *((inc, cmsis_core_ex_dest) for inc in cmsis_core_h_ex),
+        *((src, cmsis_core_dest) for src in cmsis_core_src),
+        (dfp_sysinit, dfp_dest),
+        (dfp_startup, dfp_dest),
+    ]
+    # all copies are independent, run them in the shared pool
+    e = get_executor()
+    futures = [
+        e.submit(copy_file, os.path.normpath(src), dst, cache) for src, dst in copies
+    ]
+    for fut in as_completed(futures):
+        fut.result()
+    save_copy_cache(cache_fn, cache)
 
     if amend_spl:
         print("amending with SPL (NVIC->IP to NVIC->IPR)")
-        content_replace(spl_dest + "/misc.c", "NVIC\\s*->IP\\s*", "NVIC->IPR")
+        content_replace(spl_dest + "/misc.c", NVIC_IP_PATTERN, "NVIC->IPR")
 
     #
     # autoconfig
@@ -370,7 +420,7 @@ def bootstrap(args: dict):
 
 
 def cleanup(args: dict):
-    run_command(["rm", "-rf", os.path.normpath(args["project_dir"] + "/Lib")])
+    shutil.rmtree(os.path.normpath(args["project_dir"] + "/Lib"), ignore_errors=True)
 
 
 def strap():
@@ -1,16 +1,26 @@
-import argparse
-from typing import Literal, TypedDict
+import functools
+from typing import Iterator, Literal, TypedDict
 import os
 import glob
-from collections import defaultdict
-import xml.etree.ElementTree as ET
+from collections import defaultdict, deque
 from warnings import warn
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, as_completed
 import json
+import re
+import stat
 import time
 
 from .uvconfig import UVProject, UVTarget, UVGroup
-from .uvstrap import copy_file, copy_file_to_stub, copy_file_from_stub, run_command
+from .uvstrap import (
+    copy_file,
+    copy_file_to_stub,
+    copy_file_from_stub,
+    find_uvprojx,
+    get_executor,
+)
+
+# keil separates include paths and defines with either
+PATH_SEPS = re.compile(r"[,;]")
 
 # type args_t = dict[Literal["option", "project_dir", "stub_dir", "keil_dir"], str]
 
@@ -28,6 +38,8 @@ class args_t(TypedDict):
 
 
 def parse_args() -> args_t:
+    # argparse is only paid for by commands that parse arguments
+    import argparse
 
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -112,7 +124,7 @@ def parse_args() -> args_t:
     project_dir = os.path.normpath(os.path.abspath(res.project_dir))
     assert os.path.isdir(project_dir), f"project_dir {project_dir} is not a directory"
     stub_dir = os.path.normpath(os.path.abspath(res.stub_dir))
-    run_command(["mkdir", stub_dir])
+    os.makedirs(stub_dir, exist_ok=True)
     assert os.path.isdir(stub_dir), f"stub_dir {stub_dir} is not a directory"
     assert (
         os.path.commonpath([project_dir, stub_dir]) != stub_dir
@@ -123,8 +135,8 @@ def parse_args() -> args_t:
 
     return {
         "option": res.option,
-        "project_dir": os.path.normpath(os.path.abspath(res.project_dir)),
-        "stub_dir": os.path.normpath(os.path.abspath(res.stub_dir)),
+        "project_dir": project_dir,
+        "stub_dir": stub_dir,
         "keil_dir": os.path.normpath(os.path.abspath(res.keil_dir)),
         "inplace": res.inplace,
         "local_std": res.local_std or not res.no_local_std,
@@ -139,6 +151,11 @@ class Manipulator:
     args: args_t
     links: list[tuple[str, str]]
     proj_file: str
+    # cwd does not change while running, relative paths resolve against it
+    cwd: str
+    abs_paths: dict[str, str]
+    # projects list the same files in several targets, stat each once per run
+    is_files: dict[str, bool]
 
     def __init__(self, args: args_t) -> None:
         project_dir = args["project_dir"].rstrip("/\\")
@@ -146,34 +163,46 @@ class Manipulator:
         if os.path.isfile(project_dir + f"/{proj_name}.uvprojx"):
             proj_file = project_dir + f"/{proj_name}.uvprojx"
         else:
-            cands = glob.glob(project_dir + "/*.uvprojx")
-            assert len(cands) > 0, f"no .uvprojx file found in {project_dir}"
-            proj_file = cands[0]
+            cand = find_uvprojx(project_dir)
+            assert cand is not None, f"no .uvprojx file found in {project_dir}"
+            proj_file = cand
         print(f"found project file {proj_file}")
-        tree = ET.parse(proj_file)
         self.proj_file = proj_file
-        self.proj = UVProject(tree.getroot())
+        self.proj = UVProject.from_path(proj_file)
         self.args = args
         self.links = []
+        self.cwd = os.getcwd()
+        self.abs_paths = {}
+        self.is_files = {}
         self.collect_links()
 
+    # os.path.relpath without its two abspath calls when fn is under base,
+    # both being normalized absolute paths
+    @staticmethod
+    def rel_path(fn: str, base: str) -> str:
+        if fn.startswith(base) and fn[len(base) : len(base) + 1] == os.sep:
+            return fn[len(base) + 1 :]
+        return os.path.relpath(fn, base)
+
     @staticmethod
     def fn2stub(args: args_t, fn: str) -> str:
-        rel_path = os.path.relpath(fn, args["project_dir"])
-        stub_path = os.path.join(args["stub_dir"], rel_path)
-        stub_path = os.path.normpath(os.path.abspath(stub_path))
+        rel_path = Manipulator.rel_path(fn, args["project_dir"])
+        # stub_dir is already absolute
+        stub_path = os.path.normpath(os.path.join(args["stub_dir"], rel_path))
         return stub_path
 
     @staticmethod
     def fn2proj(args: args_t, fn: str) -> str:
-        rel_path = os.path.relpath(fn, args["stub_dir"])
+        rel_path = Manipulator.rel_path(fn, args["stub_dir"])
         proj_path = os.path.join(args["project_dir"], rel_path)
         proj_path = os.path.normpath(proj_path)
         return proj_path
 
     @staticmethod
     def std2stub(args: args_t, fn: str) -> str:
-        rel_path = os.path.relpath(fn, args["keil_dir"] + "/ARM/ARMCLANG/include")
+        rel_path = Manipulator.rel_path(
+            fn, os.path.normpath(args["keil_dir"] + "/ARM/ARMCLANG/include")
+        )
         stub_path = os.path.normpath(
             (args["stub_dir"] if not args["inplace"] else args["project_dir"])
             + "/stdstub/"
@@ -181,27 +210,93 @@ class Manipulator:
         )
         return stub_path
 
+    # same as os.path.normpath(os.path.abspath(fn)), memoized and without the
+    # getcwd() call abspath makes each time
+    def abs_path(self, fn: str) -> str:
+        ret = self.abs_paths.get(fn)
+        if ret is None:
+            ret = self.abs_paths[fn] = os.path.normpath(os.path.join(self.cwd, fn))
+        return ret
+
+    def is_file(self, fn: str) -> bool:
+        ret = self.is_files.get(fn)
+        if ret is None:
+            ret = self.is_files[fn] = os.path.isfile(fn)
+        return ret
+
     @staticmethod
     def unwind_paths(paths: str) -> list[str]:
-        return paths.replace(",", ";").split(";")
+        # empty entries come from blank options and trailing separators
+        return [p for p in PATH_SEPS.split(paths) if p]
+
+    @staticmethod
+    def scan_files(
+        root: str, suffix: str, max_depth: int = -1, skip: tuple[str, ...] = ()
+    ) -> list[str]:
+        # breadth-first scandir walk, files of a dir before those of its subdirs.
+        # like glob, hidden entries are skipped; paths containing a skip token
+        # are pruned at the directory level. symlinked dirs are not descended
+        # into so link cycles cannot loop, symlinked files are still listed.
+        ret: list[str] = []
+        queue: deque[tuple[str, int]] = deque([(root, 0)])
+        while queue:
+            d, depth = queue.popleft()
+            try:
+                it = os.scandir(d)
+            except OSError:
+                continue
+            with it:
+                for e in it:
+                    if e.name.startswith(".") or any(t in e.path for t in skip):
+                        continue
+                    if e.is_dir(follow_symlinks=False):
+                        if depth != max_depth:
+                            queue.append((e.path, depth + 1))
+                    elif e.name.endswith(suffix) and e.is_file():
+                        ret.append(e.path)
+        return ret
 
     def collect_files(self) -> defaultdict[str, dict[str, list[str]]]:
         ret: defaultdict[str, dict[str, list[str]]] = defaultdict(dict)
 
         for targ in self.proj.targets.targets:
             for group in targ.groups.groups:
-                files = [file.path for file in group.files.files]
-                for i in reversed(range(len(files))):
-                    files[i] = os.path.normpath(os.path.abspath(files[i]))
-                    if not os.path.isfile(files[i]):
-                        warn(f"file {files[i]} not found, removed from list")
-                        files.pop(i)
-                    elif "stub" in files[i]:
-                        warn(f'skip {files[i]} for token "stub" in{files[i]}')
-                        files.pop(i)
+                files: list[str] = []
+                for file in group.files.files:
+                    fn = self.abs_path(file.path)
+                    if not self.is_file(fn):
+                        warn(f"file {fn} not found, removed from list")
+                    elif "stub" in fn:
+                        warn(f'skip {fn} for token "stub" in{fn}')
+                    else:
+                        files.append(fn)
                 ret[targ.name][group.name] = files
         return ret
 
+    # include paths and defines of each target, split once and shared by
+    # link collection and compile_commands.json
+    @functools.cached_property
+    def target_opts(
+        self,
+    ) -> dict[
+        str,
+        dict[Literal["common", "ass_inc", "cmp_inc", "ass_def", "cmp_def"], list[str]],
+    ]:
+        ret = {}
+        for targ in self.proj.targets.targets:
+            aads = targ.targ_opt.arm_ads.assembler_ads.various_controls.options
+            cads = targ.targ_opt.arm_ads.compiler_ads.various_controls.options
+            ret[targ.name] = {
+                "common": self.unwind_paths(
+                    targ.targ_opt.common_opt.options["IncludePath"]
+                ),
+                "ass_inc": self.unwind_paths(aads["IncludePath"]),
+                "cmp_inc": self.unwind_paths(cads["IncludePath"]),
+                "ass_def": self.unwind_paths(aads["Define"]),
+                "cmp_def": self.unwind_paths(cads["Define"]),
+            }
+        return ret
+
     def collect_includes(
         self,
     ) -> defaultdict[str, dict[Literal["common", "ass_inc", "cmp_inc"], list[str]]]:
@@ -209,63 +304,76 @@ class Manipulator:
             str, dict[Literal["common", "ass_inc", "cmp_inc"], list[str]]
         ] = defaultdict(dict)
 
-        for targ in self.proj.targets.targets:
-            ret[targ.name] = {
-                "common": self.unwind_paths(
-                    targ.targ_opt.common_opt.options["IncludePath"]
-                ),
-                "ass_inc": self.unwind_paths(
-                    targ.targ_opt.arm_ads.assembler_ads.various_controls.options[
-                        "IncludePath"
-                    ]
-                ),
-                "cmp_inc": self.unwind_paths(
-                    targ.targ_opt.arm_ads.compiler_ads.various_controls.options[
-                        "IncludePath"
-                    ]
-                ),
+        for name, opts in self.target_opts.items():
+            ret[name] = {
+                "common": opts["common"],
+                "ass_inc": opts["ass_inc"],
+                "cmp_inc": opts["cmp_inc"],
             }
 
         return ret
 
+    # project files and includes do not change while collecting links
+    @functools.cached_property
+    def files_map(self) -> defaultdict[str, dict[str, list[str]]]:
+        return self.collect_files()
+
+    @functools.cached_property
+    def includes_map(
+        self,
+    ) -> defaultdict[str, dict[Literal["common", "ass_inc", "cmp_inc"], list[str]]]:
+        return self.collect_includes()
+
     def collect_links(self):
         self.links.clear()
 
         #
         # collect src files
-        files: set[str] = set()
-        for groups in self.collect_files().values():
+        # keyed by normcase so case variants of a path on windows are one file,
+        # the first spelling seen is kept
+        files: dict[str, str] = {}
+        for groups in self.files_map.values():
             for fns in groups.values():
-                files.update(fns)
+                for fn in fns:
+                    files.setdefault(os.path.normcase(fn), fn)
         #
         # collect headers
-        for inc in self.collect_includes().values():
+        # include paths repeat across targets and option blocks, scan each once
+        inc_dirs: dict[str, None] = {}
+        for inc in self.includes_map.values():
             for paths in inc.values():
                 for p in paths:
-                    if "stub" in p:
+                    if "stub" in p or p in inc_dirs:
                         continue
 
                     # p is dir
                     if os.path.isdir(p):
-                        # print(f'collecting from {p}')
-
-                        for fn in glob.glob(p + "/**/*.h", recursive=True):
-                            # print(f'found {fn}')
-
-                            if os.path.isfile(fn) and not "stub" in fn:
-                                files.add(os.path.normpath(os.path.abspath(fn)))
+                        inc_dirs[p] = None
 
                     # p is file
                     elif os.path.isfile(p) and not "stub" in p:
-                        fn = p
-                        files.add(os.path.normpath(os.path.abspath(fn)))
+                        fn = self.abs_path(p)
+                        files.setdefault(os.path.normcase(fn), fn)
+
+        def scan_headers(p: str) -> list[str]:
+            return self.scan_files(p, ".h", skip=("stub",))
+
+        # scandir releases the gil, so include roots are walked in parallel
+        if self.args["par"] and len(inc_dirs) > 1:
+            scanned = get_executor().map(scan_headers, inc_dirs)
+        else:
+            scanned = map(scan_headers, inc_dirs)
+        for fns in scanned:
+            for fn in fns:
+                fn = self.abs_path(fn)
+                files.setdefault(os.path.normcase(fn), fn)
 
         #
         # collect markdowns
-        mds = glob.glob(self.args["project_dir"] + "/*.md") + glob.glob(
-            self.args["project_dir"] + "/**/*.md"
+        # project dir and its direct subdirs
+        mds = self.scan_files(
+            self.args["project_dir"], ".md", max_depth=1, skip=("uvhelper", "stub")
         )
-        mds = [f for f in mds if not "uvhelper" in f and not "stub" in f]
         if len(mds) < 10:
             print(f"\033[38;5;6mmarkdowns: {mds}\033[0m")
         else:
@@ -278,12 +386,11 @@ class Manipulator:
         # get links
         print(f"collected files: {len(files)}; markdowns: {len(self.links)}")
 
-        for fn in files:
-            fn = os.path.normpath(os.path.abspath(fn))
-            if (
-                os.path.commonpath([self.args["project_dir"], fn])
-                != self.args["project_dir"]
-            ):
+        # files are normalized absolute paths already, keyed by normcase, so
+        # being under project_dir is a prefix test
+        proj_prefix = os.path.normcase(self.args["project_dir"]).rstrip(os.sep) + os.sep
+        for key, fn in files.items():
+            if not key.startswith(proj_prefix):
                 print(f"\033[38;5;9mcollect links: skip {fn}\033[0m")
                 continue
             stub_fn = self.fn2stub(self.args, fn)
@@ -304,6 +411,72 @@ class Manipulator:
             )
         return incs
 
+    # compile_commands.json entries, for each file->.obj
+    def iter_compile_commands(
+        self,
+    ) -> Iterator[dict[Literal["directory", "command", "file", "output"], str]]:
+        stub_dir = self.args["stub_dir"]
+        cmd_prefix = (
+            "clang "
+            "-nostdinc -nostdinc++ -nostdlib -nostdlib++ "  # redirect std includes
+            "-ffreestanding -Dsize_t=unsigned "  # size_t problem and __asm__ error register
+        )
+        for targ in self.proj.targets.targets:
+            # copies, the lists are extended below
+            opts = self.target_opts[targ.name]
+            c_inc, a_inc = list(opts["cmp_inc"]), list(opts["ass_inc"])
+            c_defines, a_defines = list(opts["cmp_def"]), list(opts["ass_def"])
+
+            # std includes
+            if self.args["local_std"]:
+                c_inc.append(
+                    os.path.normpath(
+                        (
+                            self.args["stub_dir"]
+                            if not self.args["inplace"]
+                            else self.args["project_dir"]
+                        )
+                        + "/stdstub"
+                    )
+                )
+            elif os.path.isdir(self.args["keil_dir"] + "/ARM/ARMCLANG/include"):
+                c_inc.append(
+                    os.path.normpath(self.args["keil_dir"] + "/ARM/ARMCLANG/include")
+                )
+            else:
+                warn("\033[38;5;9mskip standard headers include\033[0m")
+
+            # commandline amendments
+            # use armclang
+            # armclang macros
+            c_defines += ["__ARMCC_VERSION=6230050", "__ARM_ACLE"]  # "__ARM_COMPAT_H"]
+            a_defines += ["__ARMCC_VERSION=6230050", "__ARM_ACLE"]  # "__ARM_COMPAT_H"]
+            # built-in functions, see https://developer.arm.com/documentation/101754/0622/armclang-Reference/Compiler-specific-Intrinsics
+            # void __breakpoint(int);
+            c_defines += [f""]
+
+            # commands only depend on the target and the file kind, join them once
+            c_cmd = cmd_prefix + "".join(
+                [f"-I{inc} " for inc in c_inc]
+                + [f"-D{defs} " for defs in c_defines if defs]
+            )
+            a_cmd = cmd_prefix + "".join(
+                [f"-I{inc} " for inc in a_inc]
+                + [f"-D{defs} " for defs in a_defines if defs]
+            )
+
+            for group in targ.groups.groups:
+                for file in group.files.files:
+                    path = file.path
+                    output = os.path.splitext(path)[0] + ".obj"
+                    cmd = a_cmd if path.endswith(".s") else c_cmd
+                    yield {
+                        "directory": stub_dir,
+                        "command": f"{cmd}-o {output} -c {path}",
+                        "file": path,
+                        "output": output,
+                    }
+
     def gen_stub(self) -> None:
         if not self.args["inplace"]:
             # if not inplace, copy and fix all source and header files
@@ -322,34 +495,34 @@ class Manipulator:
 
             # >if not self.args["inplace"]<
 
-            #
-            # update links
-            self.collect_links()
-
-            # copy files
-            with ThreadPoolExecutor() as e:
-                for fn, stub_fn in self.links:
-                    if self.args["par"] and 0:
-                        e.submit(copy_file_to_stub, fn, stub_fn)
-                    else:
-                        copy_file_to_stub(fn, stub_fn)
-
-                # # copy arm standard includes to ./stub/stub
-                #
-                # if os.path.isdir(self.args["keil_dir"] + "/ARM/ARMCLANG/include"):
-                #     for fn in glob.glob(
-                #         self.args["keil_dir"] + "/ARM/ARMCLANG/include/*.h"
-                #     ):
-                #         if os.path.isfile(fn):
-                #             e.submit(copy_file, fn, self.sys2stub(self.args, fn))
-                # else:
-                #     warn(
-                #         f"gen_stub: keil_dir {self.args['keil_dir']} is not valid, skip system includes"
-                #     )
-
-            # update local timestamp
-            for fn, stub_fn in self.links:
+            # copy files, touching each source right after so the fresh stub
+            # copy is not seen as an edit by status
+            def copy_link(fn: str, stub_fn: str):
+                copy_file_to_stub(fn, stub_fn)
                 os.utime(fn)
+
+            e = get_executor()
+            futures: list[Future] = []
+            for fn, stub_fn in self.links:
+                if self.args["par"] and 0:
+                    futures.append(e.submit(copy_link, fn, stub_fn))
+                else:
+                    copy_link(fn, stub_fn)
+
+            # # copy arm standard includes to ./stub/stub
+            #
+            # if os.path.isdir(self.args["keil_dir"] + "/ARM/ARMCLANG/include"):
+            #     for fn in glob.glob(
+            #         self.args["keil_dir"] + "/ARM/ARMCLANG/include/*.h"
+            #     ):
+            #         if os.path.isfile(fn):
+            #             e.submit(copy_file, fn, self.sys2stub(self.args, fn))
+            # else:
+            #     warn(
+            #         f"gen_stub: keil_dir {self.args['keil_dir']} is not valid, skip system includes"
+            #     )
+            for fut in as_completed(futures):
+                fut.result()
         # if not self.args["inplace"]/>
 
         #
@@ -361,88 +534,20 @@ class Manipulator:
                 f"gen_stub: collected {len(stdinc_links)} std includes: {[os.path.basename(i[0]) for i in stdinc_links]}"
             )
             input()
-            with ThreadPoolExecutor() as e:
-                for fn, stub_fn in stdinc_links:
-                    if self.args["par"] and 0:
-                        e.submit(copy_file_to_stub, fn, stub_fn)
-                    else:
-                        copy_file_to_stub(fn, stub_fn)
+            e = get_executor()
+            futures = []
+            for fn, stub_fn in stdinc_links:
+                if self.args["par"] and 0:
+                    futures.append(e.submit(copy_file_to_stub, fn, stub_fn))
+                else:
+                    copy_file_to_stub(fn, stub_fn)
+            for fut in as_completed(futures):
+                fut.result()
 
         #
         #
         # create compile_commands.json
-        # for each file->.obj
-        cmds: list[dict[Literal["directory", "command", "file", "output"], str]] = []
-        for targ in self.proj.targets.targets:
-            c_inc = (
-                targ.targ_opt.arm_ads.compiler_ads.various_controls.options[
-                    "IncludePath"
-                ]
-                .replace(",", ";")
-                .split(";")
-            )
-            a_inc = (
-                targ.targ_opt.arm_ads.assembler_ads.various_controls.options[
-                    "IncludePath"
-                ]
-                .replace(",", ";")
-                .split(";")
-            )
-            c_defines = (
-                targ.targ_opt.arm_ads.compiler_ads.various_controls.options["Define"]
-                .replace(",", ";")
-                .split(";")
-            )
-            a_defines = (
-                targ.targ_opt.arm_ads.assembler_ads.various_controls.options["Define"]
-                .replace(",", ";")
-                .split(";")
-            )
-
-            # std includes
-            if self.args["local_std"]:
-                c_inc.append(
-                    os.path.normpath(
-                        (
-                            self.args["stub_dir"]
-                            if not self.args["inplace"]
-                            else self.args["project_dir"]
-                        )
-                        + "/stdstub"
-                    )
-                )
-            elif os.path.isdir(self.args["keil_dir"] + "/ARM/ARMCLANG/include"):
-                c_inc.append(
-                    os.path.normpath(self.args["keil_dir"] + "/ARM/ARMCLANG/include")
-                )
-            else:
-                warn("\033[38;5;9mskip standard headers include\033[0m")
-
-            # commandline amendments
-            # use armclang
-            # armclang macros
-            c_defines += ["__ARMCC_VERSION=6230050", "__ARM_ACLE"]  # "__ARM_COMPAT_H"]
-            a_defines += ["__ARMCC_VERSION=6230050", "__ARM_ACLE"]  # "__ARM_COMPAT_H"]
-            # built-in functions, see https://developer.arm.com/documentation/101754/0622/armclang-Reference/Compiler-specific-Intrinsics
-            # void __breakpoint(int);
-            c_defines += [f""]
-
-            for group in targ.groups.groups:
-                for file in group.files.files:
-                    output = os.path.splitext(file.path)[0] + ".obj"
-                    cmds.append(
-                        {
-                            "directory": self.args["stub_dir"],
-                            "command": f"clang "
-                            "-nostdinc -nostdinc++ -nostdlib -nostdlib++ "  # redirect std includes
-                            "-ffreestanding -Dsize_t=unsigned "  # size_t problem and __asm__ error register
-                            f'{" ".join(["-I"+inc for inc in (a_inc if file.path.endswith(".s")else c_inc)])} '
-                            f'{" ".join(["-D"+defs for defs in (a_defines if file.path.endswith(".s")else c_defines)])}'
-                            f"-o {output} -c {file.path}",
-                            "file": file.path,
-                            "output": output,
-                        }
-                    )
+        # entries are written as they are generated, one per line
         print("generating compile_commands.json: ", end="")
         with open(
             (
@@ -451,19 +556,32 @@ class Manipulator:
                 else self.args["project_dir"]
             )
             + "/compile_commands.json",
-            "w",
-            encoding="utf-8",
+            "wb",
         ) as f:
-            json.dump(cmds, f, indent=4)
+            f.write(b"[")
+            sep = b"\n"
+            for cmd in self.iter_compile_commands():
+                f.write(sep)
+                f.write(
+                    json.dumps(cmd, separators=(",", ":"), ensure_ascii=False).encode()
+                )
+                sep = b",\n"
+            f.write(b"\n]\n")
         print("done")
 
     def collect_status(self) -> list[tuple[str, str]]:
         self.collect_links()
         ret: list[tuple[str, str]] = []
         assert len(set([l[0] for l in self.links])) == len(self.links), "multi key"
+        # one stat per side, a missing stub copy is not a change
         for fn, stub_fn in self.links:
-            if os.path.isfile(stub_fn) and os.path.getmtime(fn) < os.path.getmtime(
-                stub_fn
+            try:
+                stub_st = os.stat(stub_fn)
+            except OSError:
+                continue
+            if (
+                stat.S_ISREG(stub_st.st_mode)
+                and os.stat(fn).st_mtime < stub_st.st_mtime
             ):
                 ret.append((fn, stub_fn))
         return ret
@@ -482,15 +600,25 @@ class Manipulator:
         if len(status) == 0:
             print("\033[38;5;9msync_stub: not work to do\033[0m")
             return
-        with ThreadPoolExecutor() as e:
-            for fn, stub_fn in status:
-                if self.args["par"] and 0:
-                    e.submit(copy_file_from_stub, stub_fn, fn)
-                else:
-                    copy_file_from_stub(stub_fn, fn)
-                os.utime(fn)
+        e = get_executor()
+        futures: list[Future] = []
+        for fn, stub_fn in status:
+            if self.args["par"] and 0:
+                futures.append(e.submit(copy_file_from_stub, stub_fn, fn))
+            else:
+                copy_file_from_stub(stub_fn, fn)
+            os.utime(fn)
+        for fut in as_completed(futures):
+            fut.result()
+
+    # the cached maps describe the project as loaded, every edit ends in a
+    # write, so they are dropped there
+    def reset_collected(self):
+        for name in ("target_opts", "files_map", "includes_map"):
+            self.__dict__.pop(name, None)
 
     def write_proj(self, test=True):
+        self.reset_collected()
         self.proj.write(self.proj_file + (".xml" if test else ""))
 
     def parse_targ_group(self) -> tuple[str, str]:
@@ -547,6 +675,10 @@ class Manipulator:
         idx = targ.groups.group_names.index(group)
         g = targ.groups.groups[idx]
 
+        # normalized like commonpath compares them, so a membership test finds
+        # the same duplicates
+        existing = {os.path.normcase(os.path.normpath(f.path)) for f in g.files.files}
+        new_files: list[str] = []
         for fn in glob.glob(proj + "/" + ptrn):
             fn = os.path.relpath(fn, proj)
             if not os.path.isfile(fn):
@@ -557,22 +689,20 @@ class Manipulator:
                 print(f"\033[38;5;9mskip: {fn} for wrong suffix\033[0m")
                 continue
 
-            if os.path.commonpath((os.path.abspath(fn), stub)) == stub:
+            if os.path.commonpath((self.abs_path(fn), stub)) == stub:
                 fn2 = self.fn2proj(self.args, fn)
                 copy_file(fn, fn2)
                 fn = os.path.normpath(os.path.relpath(fn2, proj))
 
-            has_file = False
-            for f in g.files.files:
-                if os.path.commonpath((f.path, fn)) == fn:
-                    has_file = True
-                    break
-            if has_file:
+            key = os.path.normcase(os.path.normpath(fn))
+            if key in existing:
                 print(f"\033[38;5;9mskip: {fn} already exists\033[0m")
                 continue
 
-            g.files.add_file(f".{os.path.sep}{fn}")
+            new_files.append(f".{os.path.sep}{fn}")
+            existing.add(key)
 
+        g.files.add_files(new_files)
         self.write_proj(False)
 
     def add_inc(self): ...